@@ -1,6 +1,14 @@
 import random
-from typing import Dict, List, Tuple
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 from .currency_config import get_currency_config, CurrencyConfig
+from .models import RandomMode
+from .ways_table import MAX_COINS_LIMIT, get_ways_table
+
+
+# Largest amount kept in a calculator's minimum-change table; growing it that
+# far takes roughly 0.15 s once and holds two lists of this length
+MIN_CHANGE_TABLE_CENTS = 100_000
 
 
 class ChangeCalculator:
@@ -10,9 +18,14 @@ class ChangeCalculator:
         self.currency_config = get_currency_config(locale)
         self.denomination_values = [d.value_cents for d in self.currency_config.denominations]
         self.denomination_names = self.currency_config.get_denomination_names()
+        # Minimum-change DP table, grown on demand by _calculate_minimum_change
+        self._min_coins: List[float] = [0]
+        self._coin_used: List[int] = [-1]
     
     def calculate_change(self, amount_owed: float, amount_paid: float, 
-                        divisor: int = 3, seed: int = None) -> Tuple[Dict[str, int], bool]:
+                        divisor: int = 3, seed: int = None,
+                        random_mode: str = RandomMode.COIN,
+                        max_coins: Optional[int] = None) -> Tuple[Dict[str, int], bool]:
         """
         Calculate change using DP for minimum coins or random generation
         
@@ -21,6 +34,10 @@ class ChangeCalculator:
             amount_paid: Amount paid by customer  
             divisor: Divisor for random change generation
             seed: Random seed for deterministic results
+            random_mode: "coin" picks each coin at random, "uniform" picks
+                uniformly among all valid breakdowns
+            max_coins: Maximum number of coins for "uniform" random change;
+                only valid with random_mode "uniform"
             
         Returns:
             Tuple of (denominations_dict, is_random)
@@ -37,22 +54,26 @@ class ChangeCalculator:
         # Use random generation if owed amount (in cents) is divisible by divisor
         # Otherwise use optimal DP solution
         if owed_cents % divisor == 0:
+            if random_mode == RandomMode.UNIFORM:
+                return self._sample_uniform_change(change_cents, seed, max_coins), True
             return self._generate_random_change(change_cents, seed), True
         else:
             return self._calculate_minimum_change(change_cents), False
     
     def _calculate_minimum_change(self, change_cents: int) -> Dict[str, int]:
-        """Calculate minimum number of coins using dynamic programming"""
-        dp = [float('inf')] * (change_cents + 1)
-        dp[0] = 0
-        coin_used = [-1] * (change_cents + 1)
-        
-        # Build DP table
-        for amount in range(1, change_cents + 1):
-            for i, coin_value in enumerate(self.denomination_values):
-                if coin_value <= amount and dp[amount - coin_value] + 1 < dp[amount]:
-                    dp[amount] = dp[amount - coin_value] + 1
-                    coin_used[amount] = i
+        """
+        Calculate minimum number of coins using dynamic programming
+
+        Amounts up to MIN_CHANGE_TABLE_CENTS are read from a table kept on the
+        calculator, which grows on demand and is shared by every request for
+        the locale, so each call only walks back through the coins used.
+        Larger amounts get a table of their own that is not kept.
+        """
+        if change_cents <= MIN_CHANGE_TABLE_CENTS:
+            dp, coin_used = self._min_coins, self._coin_used
+        else:
+            dp, coin_used = [0], [-1]
+        self._fill_minimum_table(dp, coin_used, change_cents)
         
         if dp[change_cents] == float('inf'):
             raise ValueError(f"Cannot make change for {change_cents} cents")
@@ -69,6 +90,18 @@ class ChangeCalculator:
         
         return denominations
     
+    def _fill_minimum_table(self, dp: List[float], coin_used: List[int], change_cents: int):
+        """Extend the DP table (minimum coins and last coin per amount) up to change_cents"""
+        for amount in range(len(dp), change_cents + 1):
+            best = float('inf')
+            best_coin = -1
+            for i, coin_value in enumerate(self.denomination_values):
+                if coin_value <= amount and dp[amount - coin_value] + 1 < best:
+                    best = dp[amount - coin_value] + 1
+                    best_coin = i
+            dp.append(best)
+            coin_used.append(best_coin)
+    
     def _generate_random_change(self, change_cents: int, seed: int = None) -> Dict[str, int]:
         """Generate random change that adds up to the correct amount"""
         if seed is not None:
@@ -103,6 +136,26 @@ class ChangeCalculator:
         
         return denominations
     
+    def _sample_uniform_change(self, change_cents: int, seed: int = None,
+                               max_coins: Optional[int] = None) -> Dict[str, int]:
+        """Draw change uniformly among all breakdowns, using the shared ways-count table"""
+        if seed is not None:
+            random.seed(seed)
+        
+        # A limit no breakdown can reach is the same as no limit, and the
+        # unlimited table is far smaller
+        if max_coins is not None and max_coins >= change_cents // min(self.denomination_values):
+            max_coins = None
+        
+        table = get_ways_table(self.currency_config.locale, coin_limited=max_coins is not None)
+        counts = table.sample(change_cents, max_coins=max_coins)
+        
+        denominations = {}
+        for coin_value, count in zip(table.denomination_values, counts):
+            if count:
+                denominations[self.denomination_names[coin_value][0]] = count
+        return denominations
+    
     def format_change_string(self, denominations: Dict[str, int]) -> str:
         """Format denominations into human-readable string"""
         if not denominations:
@@ -125,3 +178,19 @@ class ChangeCalculator:
         owed_cents = int(round(amount_owed * 100))
         paid_cents = int(round(amount_paid * 100))
         return paid_cents - owed_cents
+
+
+def validate_random_options(random_mode: str, max_coins: Optional[int]):
+    """Check random change options before any calculation starts"""
+    if max_coins is None:
+        return
+    if random_mode != RandomMode.UNIFORM:
+        raise ValueError("max_coins requires random_mode=uniform")
+    if not 1 <= max_coins <= MAX_COINS_LIMIT:
+        raise ValueError(f"max_coins must be between 1 and {MAX_COINS_LIMIT}")
+
+
+@lru_cache(maxsize=None)
+def get_calculator(locale: str = "en-US") -> ChangeCalculator:
+    """Get a shared ChangeCalculator for a locale, built once and reused"""
+    return ChangeCalculator(locale)
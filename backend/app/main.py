@@ -1,13 +1,18 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Query, Request, WebSocket, WebSocketDisconnect, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import PlainTextResponse
-from typing import List
+from typing import List, Optional
 import uvicorn
 import csv
 import io
+import json
 
-from .models import Locale
-from .change_calculator import ChangeCalculator
+from .models import Locale, RandomMode
+from .change_calculator import MIN_CHANGE_TABLE_CENTS, get_calculator, validate_random_options
+from .ways_table import UniformChangeError
+from .uploads import (
+    MAX_CHUNK_SIZE, UploadLimitError, UploadSession, create_upload_session, get_upload_session, upload_sessions
+)
 
 app = FastAPI(
     title="Cash Register API",
@@ -53,11 +58,20 @@ async def get_supported_locales():
     }
 
 
+def _check_random_options(random_mode: RandomMode, max_coins: Optional[int]):
+    try:
+        validate_random_options(random_mode, max_coins)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @app.post("/process-file", response_class=PlainTextResponse)
 async def process_flat_file(
     file: UploadFile = File(...),
     locale: str = Form("en-US"),
-    divisor: int = Form(3)
+    divisor: int = Form(3),
+    random_mode: RandomMode = Form(RandomMode.COIN),
+    max_coins: Optional[int] = Form(None)
 ):
     """
     Process a flat file with transaction data
@@ -69,12 +83,13 @@ async def process_flat_file(
     
     Returns formatted change strings, one per line
     """
+    _check_random_options(random_mode, max_coins)
     try:
         content = await file.read()
         file_content = content.decode('utf-8')
         lines = file_content.strip().split('\n')
         results = []
-        calculator = ChangeCalculator(locale)
+        calculator = get_calculator(locale)
         
         for line_num, line in enumerate(lines, 1):
             line = line.strip()
@@ -101,12 +116,15 @@ async def process_flat_file(
                     continue
                 
                 denominations, is_random = calculator.calculate_change(
-                    amount_owed, amount_paid, divisor
+                    amount_owed, amount_paid, divisor,
+                    random_mode=random_mode, max_coins=max_coins
                 )
                 
                 formatted_change = calculator.format_change_string(denominations)
                 results.append(formatted_change)
                 
+            except UniformChangeError as e:
+                results.append(f"Line {line_num}: {str(e)}")
             except ValueError as e:
                 results.append(f"Line {line_num}: Invalid number format - {str(e)}")
             except Exception as e:
@@ -122,19 +140,22 @@ async def process_flat_file(
 async def process_flat_file_detailed(
     file: UploadFile = File(...),
     locale: str = Form("en-US"),
-    divisor: int = Form(3)
+    divisor: int = Form(3),
+    random_mode: RandomMode = Form(RandomMode.COIN),
+    max_coins: Optional[int] = Form(None)
 ):
     """
     Process a flat file with detailed results
     
     Returns structured data with change calculations for each line
     """
+    _check_random_options(random_mode, max_coins)
     try:
         content = await file.read()
         file_content = content.decode('utf-8')
         lines = file_content.strip().split('\n')
         results = []
-        calculator = ChangeCalculator(locale)
+        calculator = get_calculator(locale)
         
         for line_num, line in enumerate(lines, 1):
             line = line.strip()
@@ -180,7 +201,8 @@ async def process_flat_file_detailed(
                     continue
                 
                 denominations, is_random = calculator.calculate_change(
-                    amount_owed, amount_paid, divisor
+                    amount_owed, amount_paid, divisor,
+                    random_mode=random_mode, max_coins=max_coins
                 )
                 
                 formatted_change = calculator.format_change_string(denominations)
@@ -196,6 +218,13 @@ async def process_flat_file_detailed(
                     "success": True
                 })
                 
+            except UniformChangeError as e:
+                results.append({
+                    "line_number": line_num,
+                    "input": line,
+                    "error": str(e),
+                    "success": False
+                })
             except ValueError as e:
                 results.append({
                     "line_number": line_num,
@@ -222,5 +251,228 @@ async def process_flat_file_detailed(
         raise HTTPException(status_code=400, detail=f"File processing error: {str(e)}")
 
 
+def _get_upload_or_404(upload_id: str) -> UploadSession:
+    session = get_upload_session(upload_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Unknown upload: {upload_id}")
+    return session
+
+
+@app.post("/uploads")
+async def create_upload(
+    total_size: int = Form(...),
+    locale: str = Form("en-US"),
+    divisor: int = Form(3),
+    random_mode: RandomMode = Form(RandomMode.COIN),
+    max_coins: Optional[int] = Form(None)
+):
+    """
+    Start a resumable chunked upload
+
+    Chunks are then sent to /uploads/{upload_id}/chunks in any order and
+    lines are processed as soon as the bytes before them have arrived.
+    """
+    try:
+        session = create_upload_session(locale, divisor, total_size, random_mode, max_coins)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except UploadLimitError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return session.status()
+
+
+@app.put("/uploads/{upload_id}/chunks")
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0),
+    after_line: Optional[int] = Query(None, ge=0)
+):
+    """
+    Upload one chunk of the file as the raw request body
+
+    Returns the upload status along with the results for any lines this
+    chunk completed or, when after_line is given, every result after that
+    line so a client can pass its cursor and recover results whose response
+    was lost. Passing after_line also acknowledges the results up to it,
+    which the session then discards. Bytes that were already received are
+    ignored, so a client can safely resend after a failure.
+    """
+    session = _get_upload_or_404(upload_id)
+    data = bytearray()
+    async for part in request.stream():
+        data += part
+        if len(data) > MAX_CHUNK_SIZE:
+            raise HTTPException(status_code=413, detail=f"Chunk exceeds limit of {MAX_CHUNK_SIZE} bytes")
+    data = bytes(data)
+    if after_line is not None:
+        session.acknowledge(after_line)
+    try:
+        results = session.add_chunk(offset, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if after_line is not None:
+        results = session.results_after(after_line)
+    return {**session.status(), "results": results}
+
+
+@app.get("/uploads/{upload_id}")
+async def get_upload_status(upload_id: str):
+    """Get received byte ranges and progress so an interrupted upload can resume"""
+    return _get_upload_or_404(upload_id).status()
+
+
+@app.get("/uploads/{upload_id}/results")
+async def get_upload_results(upload_id: str, after_line: int = Query(0, ge=0)):
+    """
+    Get detailed results produced so far for lines after after_line
+
+    Results up to after_line are acknowledged and discarded, which lets
+    processing continue if it was paused waiting for the client.
+    """
+    session = _get_upload_or_404(upload_id)
+    session.acknowledge(after_line)
+    return {**session.status(), "after_line": after_line, "results": session.results_after(after_line)}
+
+
+@app.delete("/uploads/{upload_id}")
+async def delete_upload(upload_id: str):
+    """Discard an upload session and its results"""
+    _get_upload_or_404(upload_id)
+    del upload_sessions[upload_id]
+    return {"upload_id": upload_id, "deleted": True}
+
+
+# Largest change a register session calculates per message: amounts up to this
+# are served from the calculator's shared minimum-change table, while larger
+# ones would build a table of their own on the event loop shared by all sessions
+MAX_SESSION_CHANGE_CENTS = MIN_CHANGE_TABLE_CENTS
+
+
+@app.websocket("/ws/register")
+async def register_session(
+    websocket: WebSocket,
+    locale: str = "en-US",
+    divisor: int = 3,
+    random_mode: RandomMode = RandomMode.COIN,
+    max_coins: Optional[int] = None
+):
+    """
+    Persistent register session for single-transaction calculations
+
+    Locale, divisor and random mode options are fixed for the session via
+    query parameters, e.g. "/ws/register?locale=fr-FR&divisor=3".
+
+    Expected message format (JSON):
+    - {"id": "sale-1", "amount_owed": 2.12, "amount_paid": 3.00}
+
+    Messages may be pipelined; each reply echoes the message "id" so the
+    client can match results without waiting for every round trip. Change
+    above MAX_SESSION_CHANGE_CENTS is rejected with an error result.
+    """
+    try:
+        calculator = get_calculator(locale)
+        if divisor < 1:
+            raise ValueError("Divisor must be at least 1")
+        validate_random_options(random_mode, max_coins)
+    except ValueError as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(e))
+        return
+
+    await websocket.accept()
+    try:
+        while True:
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", status.WS_1000_NORMAL_CLOSURE))
+            try:
+                if frame.get("text") is None:
+                    raise ValueError("binary frame")
+                message = json.loads(frame["text"])
+            except ValueError:
+                await websocket.send_json({
+                    "id": None,
+                    "error": "Invalid message - expected JSON text",
+                    "success": False
+                })
+                continue
+
+            if not isinstance(message, dict):
+                await websocket.send_json({
+                    "id": None,
+                    "error": "Invalid message - expected JSON object",
+                    "success": False
+                })
+                continue
+
+            message_id = message.get("id")
+            try:
+                amount_owed = float(message["amount_owed"])
+                amount_paid = float(message["amount_paid"])
+                change_cents = calculator.get_change_amount_cents(amount_owed, amount_paid)
+            except KeyError as e:
+                await websocket.send_json({
+                    "id": message_id,
+                    "error": f"Missing field - {e.args[0]}",
+                    "success": False
+                })
+                continue
+            except (TypeError, ValueError, OverflowError) as e:
+                await websocket.send_json({
+                    "id": message_id,
+                    "error": f"Invalid number format - {str(e)}",
+                    "success": False
+                })
+                continue
+
+            if amount_paid < amount_owed:
+                await websocket.send_json({
+                    "id": message_id,
+                    "error": "Insufficient payment",
+                    "success": False
+                })
+                continue
+
+            if change_cents > MAX_SESSION_CHANGE_CENTS:
+                await websocket.send_json({
+                    "id": message_id,
+                    "error": f"Change exceeds session limit of {MAX_SESSION_CHANGE_CENTS} cents",
+                    "success": False
+                })
+                continue
+
+            try:
+                denominations, is_random = calculator.calculate_change(
+                    amount_owed, amount_paid, divisor,
+                    random_mode=random_mode, max_coins=max_coins
+                )
+            except UniformChangeError as e:
+                await websocket.send_json({
+                    "id": message_id,
+                    "error": str(e),
+                    "success": False
+                })
+                continue
+            except Exception as e:
+                await websocket.send_json({
+                    "id": message_id,
+                    "error": f"Error - {str(e)}",
+                    "success": False
+                })
+                continue
+
+            await websocket.send_json({
+                "id": message_id,
+                "change_amount": change_cents / 100.0,
+                "change_cents": change_cents,
+                "formatted_change": calculator.format_change_string(denominations),
+                "denominations": denominations,
+                "is_random": is_random,
+                "success": True
+            })
+    except WebSocketDisconnect:
+        pass
+
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
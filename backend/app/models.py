@@ -4,3 +4,8 @@ from enum import Enum
 class Locale(str, Enum):
     EN_US = "en-US"
     FR_FR = "fr-FR"
+
+
+class RandomMode(str, Enum):
+    COIN = "coin"        # Pick each coin uniformly among those that still fit
+    UNIFORM = "uniform"  # Pick uniformly among all valid breakdowns
@@ -0,0 +1,319 @@
+import bisect
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from .change_calculator import ChangeCalculator, get_calculator, validate_random_options
+from .models import RandomMode
+from .ways_table import UniformChangeError
+
+
+# Sessions idle for longer than this are discarded
+UPLOAD_SESSION_TTL_SECONDS = 60 * 60
+
+# Completed sessions only wait for the client to collect its last results
+COMPLETED_SESSION_TTL_SECONDS = 5 * 60
+
+# Limits on what a single client can make the worker hold in memory
+MAX_UPLOAD_SIZE = 50 * 1024 * 1024
+MAX_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Results a session holds until the client acknowledges them; once reached,
+# further bytes wait unprocessed in pending (about 1 KB per result)
+MAX_RETAINED_RESULTS = 10_000
+
+# Limits across all sessions on this worker: sessions open at once, and
+# declared bytes not yet processed, which bounds what pending can hold
+MAX_UPLOAD_SESSIONS = 16
+MAX_OUTSTANDING_UPLOAD_BYTES = 4 * MAX_UPLOAD_SIZE
+
+
+class UploadLimitError(Exception):
+    """Raised when the worker is already holding as many uploads as it allows"""
+
+
+class UploadSession:
+    """Tracks a resumable chunked upload and processes lines as bytes arrive"""
+
+    def __init__(self, locale: str, divisor: int, total_size: int,
+                 random_mode: str = RandomMode.COIN, max_coins: Optional[int] = None):
+        if divisor < 1:
+            raise ValueError("Divisor must be at least 1")
+        validate_random_options(random_mode, max_coins)
+        if total_size < 0:
+            raise ValueError("Total size must not be negative")
+        if total_size > MAX_UPLOAD_SIZE:
+            raise ValueError(f"Total size exceeds limit of {MAX_UPLOAD_SIZE} bytes")
+
+        self.upload_id = uuid.uuid4().hex
+        self.locale = locale
+        self.divisor = divisor
+        self.random_mode = random_mode
+        self.max_coins = max_coins
+        self.total_size = total_size
+        self.calculator: ChangeCalculator = get_calculator(locale)
+        self.last_activity = time.monotonic()
+
+        # Bytes before processed_offset have been split into lines already;
+        # bytes past it wait in pending, as non-overlapping pieces keyed by
+        # offset, until the gap before them is filled.
+        self.processed_offset = 0
+        self.pending: Dict[int, bytes] = {}
+        self.partial_line = b""
+
+        # Lines are numbered as /process-file numbers them after stripping
+        # the file: blank lines before the first transaction are not counted
+        # and blank lines are only counted once a later line follows them.
+        self.line_count = 0
+        self.blank_lines = 0
+
+        # Results not yet acknowledged by the client, in line order, with
+        # their line numbers kept alongside for bisecting
+        self.results: List[dict] = []
+        self.result_lines: List[int] = []
+        self.success_count = 0
+        self.error_count = 0
+
+        if total_size == 0:
+            self._flush()
+
+    @property
+    def completed(self) -> bool:
+        return self.processed_offset == self.total_size and not self.partial_line
+
+    def add_chunk(self, offset: int, data: bytes) -> List[dict]:
+        """
+        Store a chunk and process every line that has become contiguous
+
+        Chunks may overlap earlier ones or use a different size; only bytes
+        not already held are kept, so resent chunks are harmless. Processing
+        pauses while MAX_RETAINED_RESULTS results await acknowledgement.
+
+        Args:
+            offset: Byte offset of the chunk within the file
+            data: Chunk contents
+
+        Returns:
+            Results for the lines completed by this call, in file order
+        """
+        self.last_activity = time.monotonic()
+        if len(data) > MAX_CHUNK_SIZE:
+            raise ValueError(f"Chunk exceeds limit of {MAX_CHUNK_SIZE} bytes")
+        if offset < 0 or offset + len(data) > self.total_size:
+            raise ValueError("Chunk outside of declared file size")
+
+        first_new_result = len(self.results)
+        self._store(offset, data)
+        self._process_pending()
+        return self.results[first_new_result:]
+
+    def acknowledge(self, line_number: int):
+        """
+        Drop results up to line_number, which the client has received, and
+        resume processing if it was paused on the retained results limit
+        """
+        self.last_activity = time.monotonic()
+        acknowledged = bisect.bisect_right(self.result_lines, line_number)
+        if acknowledged:
+            del self.results[:acknowledged]
+            del self.result_lines[:acknowledged]
+            self._process_pending()
+
+    def results_after(self, line_number: int) -> List[dict]:
+        """Get retained results for lines after line_number, for clients catching up"""
+        return self.results[bisect.bisect_right(self.result_lines, line_number):]
+
+    def _process_pending(self):
+        """Split contiguous bytes into lines until a gap or the retained results limit"""
+        while self.processed_offset in self.pending and len(self.results) < MAX_RETAINED_RESULTS:
+            chunk = self.pending.pop(self.processed_offset)
+            buffer = self.partial_line + chunk
+            start = 0
+            while len(self.results) < MAX_RETAINED_RESULTS:
+                end = buffer.find(b"\n", start)
+                if end == -1:
+                    break
+                self._process_line(buffer[start:end])
+                start = end + 1
+
+            buffer_offset = self.processed_offset - len(self.partial_line)
+            if b"\n" in buffer[start:]:
+                # Paused on the limit; the unprocessed tail goes back to pending
+                self.processed_offset = buffer_offset + start
+                self.pending[self.processed_offset] = buffer[start:]
+                self.partial_line = b""
+            else:
+                self.processed_offset += len(chunk)
+                self.partial_line = buffer[start:]
+
+        if self.processed_offset == self.total_size:
+            self._flush()
+
+    def _store(self, offset: int, data: bytes):
+        """Add the bytes of a chunk that are not already processed or pending"""
+        start = max(offset, self.processed_offset)
+        end = offset + len(data)
+        for piece_start in sorted(self.pending):
+            piece_end = piece_start + len(self.pending[piece_start])
+            if start >= end or piece_start >= end:
+                break
+            if piece_end <= start:
+                continue
+            if start < piece_start:
+                self.pending[start] = data[start - offset:piece_start - offset]
+            start = max(start, piece_end)
+        if start < end:
+            self.pending[start] = data[start - offset:]
+
+    def received_ranges(self) -> List[Tuple[int, int]]:
+        """Get the (start, end) byte ranges received so far"""
+        ranges = [(0, self.processed_offset)] if self.processed_offset else []
+        for offset in sorted(self.pending):
+            end = offset + len(self.pending[offset])
+            if ranges and ranges[-1][1] == offset:
+                ranges[-1] = (ranges[-1][0], end)
+            else:
+                ranges.append((offset, end))
+        return ranges
+
+    def status(self) -> dict:
+        """Get resume information and progress for the upload"""
+        return {
+            "upload_id": self.upload_id,
+            "total_size": self.total_size,
+            "received_ranges": [list(r) for r in self.received_ranges()],
+            "processed_bytes": self.processed_offset,
+            "total_lines": self.line_count,
+            "processed_lines": self.success_count,
+            "error_lines": self.error_count,
+            "completed": self.completed,
+        }
+
+    def _flush(self):
+        """Process the trailing line once the whole file has arrived"""
+        if self.partial_line and len(self.results) < MAX_RETAINED_RESULTS:
+            line, self.partial_line = self.partial_line, b""
+            self._process_line(line)
+
+    def _process_line(self, raw_line: bytes):
+        """Calculate change for one line, matching /process-file-detailed results"""
+        line = raw_line.decode("utf-8", errors="replace").strip()
+        if not line:
+            if self.line_count:
+                self.blank_lines += 1
+            return
+        self.line_count += self.blank_lines + 1
+        self.blank_lines = 0
+        line_num = self.line_count
+
+        calculator = self.calculator
+        try:
+            parts = line.split(',')
+            if len(parts) != 2:
+                self._add_result({
+                    "line_number": line_num,
+                    "input": line,
+                    "error": "Invalid format - expected 'amount_owed,amount_paid'",
+                    "success": False
+                })
+                return
+
+            amount_owed = float(parts[0].strip())
+            amount_paid = float(parts[1].strip())
+
+            if amount_paid < amount_owed:
+                self._add_result({
+                    "line_number": line_num,
+                    "input": line,
+                    "error": "Insufficient payment",
+                    "success": False
+                })
+                return
+
+            change_cents = calculator.get_change_amount_cents(amount_owed, amount_paid)
+            denominations, is_random = calculator.calculate_change(
+                amount_owed, amount_paid, self.divisor,
+                random_mode=self.random_mode, max_coins=self.max_coins
+            )
+
+            self._add_result({
+                "line_number": line_num,
+                "input": line,
+                "change_amount": change_cents / 100.0,
+                "change_cents": change_cents,
+                "formatted_change": calculator.format_change_string(denominations),
+                "denominations": denominations,
+                "is_random": is_random,
+                "success": True
+            })
+
+        except UniformChangeError as e:
+            self._add_result({
+                "line_number": line_num,
+                "input": line,
+                "error": str(e),
+                "success": False
+            })
+        except ValueError as e:
+            self._add_result({
+                "line_number": line_num,
+                "input": line,
+                "error": f"Invalid number format - {str(e)}",
+                "success": False
+            })
+        except Exception as e:
+            self._add_result({
+                "line_number": line_num,
+                "input": line,
+                "error": f"Error - {str(e)}",
+                "success": False
+            })
+
+
+    def _add_result(self, result: dict):
+        self.results.append(result)
+        self.result_lines.append(result["line_number"])
+        if result["success"]:
+            self.success_count += 1
+        else:
+            self.error_count += 1
+
+
+# In-memory session store; uploads are tied to the worker that created them
+upload_sessions: Dict[str, UploadSession] = {}
+
+
+def _discard_expired_sessions():
+    now = time.monotonic()
+    for upload_id, session in list(upload_sessions.items()):
+        ttl = COMPLETED_SESSION_TTL_SECONDS if session.completed else UPLOAD_SESSION_TTL_SECONDS
+        if now - session.last_activity > ttl:
+            del upload_sessions[upload_id]
+
+
+def create_upload_session(locale: str, divisor: int, total_size: int,
+                          random_mode: str = RandomMode.COIN,
+                          max_coins: Optional[int] = None) -> UploadSession:
+    """
+    Start a new upload session, discarding sessions that have gone idle
+
+    Raises:
+        ValueError: If the session options are invalid
+        UploadLimitError: If the worker already holds too many sessions or
+            too many bytes still waiting to be processed
+    """
+    _discard_expired_sessions()
+    session = UploadSession(locale, divisor, total_size, random_mode, max_coins)
+    if len(upload_sessions) >= MAX_UPLOAD_SESSIONS:
+        raise UploadLimitError("Too many uploads in progress - try again later")
+    outstanding = sum(s.total_size - s.processed_offset for s in upload_sessions.values())
+    if outstanding + total_size > MAX_OUTSTANDING_UPLOAD_BYTES:
+        raise UploadLimitError("Too much upload data in progress - try again later")
+    upload_sessions[session.upload_id] = session
+    return session
+
+
+def get_upload_session(upload_id: str) -> Optional[UploadSession]:
+    """Get an upload session by id, discarding sessions that have gone idle"""
+    _discard_expired_sessions()
+    return upload_sessions.get(upload_id)
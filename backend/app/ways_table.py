@@ -0,0 +1,167 @@
+import random
+from functools import lru_cache
+from typing import List, Optional
+
+from .currency_config import get_currency_config
+
+
+# Largest coin limit a table can be built for
+MAX_COINS_LIMIT = 100
+
+# Largest table (stored counts across all rows) built on request; filling it
+# costs roughly 0.15 s per million cells, once per locale
+MAX_TABLE_CELLS = 4_000_000
+
+# Ways to make each amount from no denominations at all: only zero
+_NOTHING = [1]
+
+
+class UniformChangeError(ValueError):
+    """Raised when uniform random change cannot be drawn for an amount"""
+
+
+class WaysTable:
+    """
+    Counts the distinct change breakdowns for every amount, so that a
+    breakdown can be drawn uniformly at random from all valid ones.
+
+    Without a coin limit, ways[i][n] is the number of ways to make n cents
+    from denominations i and smaller. A coin-limited table adds a layer per
+    coin count instead: ways[i][c][n] uses at most c coins, so one table
+    serves every max_coins up to the largest layer built. Row (i, c) is only
+    stored up to c times denomination i, the most those coins can add up to.
+
+    The table grows on demand, extending only the layers a request needs,
+    and is reused afterwards. Growing it costs one step per new cell; every sample after
+    that costs O(denominations * log amount). Requests that would grow the
+    table past MAX_TABLE_CELLS are rejected.
+    """
+
+    def __init__(self, denomination_values: List[int], coin_limited: bool = False):
+        self.denomination_values = sorted(denomination_values, reverse=True)
+        self.coin_limited = coin_limited
+        # Rows per denomination: one row without a coin limit, else one per layer
+        self._ways: List[List[List[int]]] = [[] for _ in self.denomination_values]
+        # Largest amount each layer's rows have been filled for
+        self._covered: List[int] = []
+
+    def count(self, amount_cents: int, max_coins: Optional[int] = None) -> int:
+        """Number of distinct breakdowns of an amount within the coin limit"""
+        self._extend(amount_cents, max_coins)
+        return self._lookup(0, self._top_layer(max_coins), amount_cents)
+
+    def sample(self, amount_cents: int, rng: random.Random = random,
+               max_coins: Optional[int] = None) -> List[int]:
+        """
+        Draw one breakdown uniformly among all valid breakdowns
+
+        Each denomination's count is found by binary search over the table,
+        so once the table covers the amount a sample costs
+        O(denominations * log(amount)) lookups.
+
+        Returns:
+            Coin count per denomination, largest denomination first
+
+        Raises:
+            UniformChangeError: If no breakdown fits the coin limit, or the
+                table would grow past MAX_TABLE_CELLS
+        """
+        total = self.count(amount_cents, max_coins)
+        if total == 0:
+            limit = "" if max_coins is None else f" with at most {max_coins} coins"
+            raise UniformChangeError(f"Cannot make change for {amount_cents} cents{limit}")
+
+        counts = []
+        remaining = amount_cents
+        layer = self._top_layer(max_coins)
+        # r picks one breakdown out of the current (remaining, layer) subtree.
+        # Taking at least j coins of denomination i leaves
+        # ways[i][layer - j][remaining - j * value] breakdowns, which shrinks as
+        # j grows, so the count is the largest j whose subtree still exceeds r.
+        r = rng.randrange(total)
+        for i, value in enumerate(self.denomination_values):
+            low, high = 0, remaining // value
+            if self.coin_limited:
+                high = min(high, layer)
+            while low < high:
+                mid = (low + high + 1) // 2
+                if self._lookup(i, self._next_layer(layer, mid), remaining - mid * value) > r:
+                    low = mid
+                else:
+                    high = mid - 1
+
+            r -= self._lookup(i, self._next_layer(layer, low + 1), remaining - (low + 1) * value)
+            counts.append(low)
+            remaining -= low * value
+            layer = self._next_layer(layer, low)
+
+        return counts
+
+    def _top_layer(self, max_coins: Optional[int]) -> int:
+        if not self.coin_limited:
+            return 0
+        if max_coins is None or not 1 <= max_coins <= MAX_COINS_LIMIT:
+            raise ValueError(f"max_coins must be between 1 and {MAX_COINS_LIMIT}")
+        return max_coins
+
+    def _next_layer(self, layer: int, coins_used: int) -> int:
+        return layer - coins_used if self.coin_limited else layer
+
+    def _lookup(self, i: int, layer: int, amount_cents: int) -> int:
+        if amount_cents < 0 or layer < 0:
+            return 0
+        if i == len(self.denomination_values):
+            return 1 if amount_cents == 0 else 0
+        row = self._ways[i][layer]
+        return row[amount_cents] if amount_cents < len(row) else 0
+
+    def _row_length(self, i: int, layer: int, amount_cents: int) -> int:
+        if not self.coin_limited:
+            return amount_cents + 1
+        return min(amount_cents, layer * self.denomination_values[i]) + 1
+
+    def _extend(self, amount_cents: int, max_coins: Optional[int] = None):
+        """Fill in rows for amounts up to amount_cents in layers up to max_coins"""
+        top_layer = self._top_layer(max_coins)
+        # Coverage never increases with the layer, so the top layer tells
+        # whether every layer below it already covers the amount
+        if top_layer < len(self._covered) and self._covered[top_layer] >= amount_cents:
+            return
+
+        covered = self._covered + [-1] * (top_layer + 1 - len(self._covered))
+        targets = [max(amount, amount_cents) if layer <= top_layer else amount
+                   for layer, amount in enumerate(covered)]
+        cells = sum(self._row_length(i, layer, amount)
+                    for i in range(len(self._ways)) for layer, amount in enumerate(targets))
+        if cells > MAX_TABLE_CELLS:
+            raise UniformChangeError(f"Uniform change for {amount_cents} cents exceeds the table size limit")
+
+        for rows in self._ways:
+            while len(rows) < len(targets):
+                rows.append([])
+        # Layers in increasing order and denominations smallest first, so the
+        # rows each new cell reads from are already complete
+        for layer in range(top_layer + 1):
+            for i in reversed(range(len(self.denomination_values))):
+                below = self._ways[i + 1][layer] if i + 1 < len(self._ways) else _NOTHING
+                row = self._ways[i][layer]
+                if not self.coin_limited:
+                    left = row
+                elif layer:
+                    left = self._ways[i][layer - 1]
+                else:
+                    left = []
+                value = self.denomination_values[i]
+                for amount in range(len(row), self._row_length(i, layer, targets[layer])):
+                    ways = below[amount] if amount < len(below) else 0
+                    if amount >= value and amount - value < len(left):
+                        ways += left[amount - value]
+                    row.append(ways)
+        self._covered = targets
+
+
+@lru_cache(maxsize=None)
+def get_ways_table(locale: str, coin_limited: bool = False) -> WaysTable:
+    """Get the shared ways-count table for a locale, with or without coin layers"""
+    config = get_currency_config(locale)
+    return WaysTable([d.value_cents for d in config.denominations], coin_limited)
@@ -0,0 +1,319 @@
+"""
+Load generator for the Cash Register API
+
+Drives /process-file, /process-file-detailed and /health concurrently and
+reports throughput, p50/p95/p99 latency and event-loop lag. Runs either
+against a live server (--url) or in-process through httpx's ASGI transport,
+in which case the lag monitor shares the app's event loop and shows when
+CPU-bound change calculation blocks other requests such as health checks.
+Against a live server the app's loop cannot be observed, so event-loop lag
+is left out and only the /health probe latency reflects server blocking.
+
+Usage (from the backend directory):
+    python -m scripts.load_test --concurrency 20 --duration 10
+    python -m scripts.load_test --url http://localhost:8000 --output run.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+import httpx
+
+
+ENDPOINTS = ["/process-file", "/process-file-detailed", "/health"]
+
+
+def build_transaction_file(lines: int, random_ratio: float, divisor: int,
+                           rng: random.Random) -> bytes:
+    """
+    Build a transaction file where about random_ratio of the lines take the
+    random change path (owed cents divisible by divisor)
+    """
+    rows = []
+    for _ in range(lines):
+        owed_cents = rng.randint(1, 10000)
+        remainder = owed_cents % divisor
+        if rng.random() < random_ratio:
+            owed_cents -= remainder
+            if owed_cents == 0:
+                owed_cents = divisor
+        elif remainder == 0 and divisor > 1:
+            owed_cents += 1
+        paid_cents = owed_cents + rng.randint(0, 10000)
+        rows.append(f"{owed_cents / 100:.2f},{paid_cents / 100:.2f}")
+    return "\n".join(rows).encode("utf-8")
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize_latencies(latencies_ms: List[float]) -> dict:
+    """Count, mean, percentiles and max of a latency sample, in milliseconds"""
+    values = sorted(latencies_ms)
+    return {
+        "count": len(values),
+        "mean_ms": sum(values) / len(values) if values else None,
+        "p50_ms": percentile(values, 50),
+        "p95_ms": percentile(values, 95),
+        "p99_ms": percentile(values, 99),
+        "max_ms": values[-1] if values else None,
+    }
+
+
+async def monitor_event_loop_lag(interval: float, samples: List[float],
+                                 stop: asyncio.Event):
+    """Record how late the event loop wakes up from a fixed sleep"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - expected) * 1000)
+
+
+async def probe_health(client: httpx.AsyncClient, interval: float,
+                       samples: List[float], stop: asyncio.Event):
+    """Poll /health at a fixed rate, as a load balancer would"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            await client.get("/health")
+        except httpx.HTTPError:
+            pass
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+
+
+async def run_load_test(
+    client: httpx.AsyncClient,
+    concurrency: int = 10,
+    duration: float = 10.0,
+    max_requests: Optional[int] = None,
+    file_sizes: Sequence[int] = (10, 100, 1000),
+    random_ratio: float = 0.33,
+    random_mode: str = "coin",
+    divisor: int = 3,
+    locale: str = "en-US",
+    endpoint_weights: Optional[Dict[str, float]] = None,
+    health_interval: float = 0.1,
+    lag_interval: float = 0.01,
+    measure_loop_lag: bool = True,
+    seed: int = 0,
+) -> dict:
+    """
+    Run the load test and return a JSON-serialisable report
+
+    Args:
+        client: Client pointed at the API, remote or in-process
+        concurrency: Number of concurrent request workers
+        duration: Seconds to run for
+        max_requests: Stop early after this many requests
+        file_sizes: Lines per uploaded file; each request picks one at random
+        random_ratio: Fraction of lines that take the random change path
+        random_mode: Random change mode sent with file requests
+        divisor: Divisor sent with file requests
+        locale: Locale sent with file requests
+        endpoint_weights: Relative request mix per endpoint
+        health_interval: Seconds between background /health probes
+        lag_interval: Seconds between event-loop lag samples
+        measure_loop_lag: Sample lag of the running event loop; only
+            meaningful when the app runs in-process on the same loop
+        seed: Seed for generated files and request mix
+    """
+    if endpoint_weights is None:
+        endpoint_weights = {"/process-file": 1.0, "/process-file-detailed": 1.0, "/health": 1.0}
+    endpoints = [e for e in ENDPOINTS if endpoint_weights.get(e, 0) > 0]
+    if not endpoints:
+        raise ValueError("At least one endpoint needs a positive weight")
+    weights = [endpoint_weights[e] for e in endpoints]
+
+    rng = random.Random(seed)
+    files = {size: build_transaction_file(size, random_ratio, divisor, rng) for size in file_sizes}
+    form = {"locale": locale, "divisor": str(divisor), "random_mode": random_mode}
+
+    latencies: Dict[str, List[float]] = {e: [] for e in endpoints}
+    errors: Dict[str, int] = {e: 0 for e in endpoints}
+    lag_samples: List[float] = []
+    health_samples: List[float] = []
+    issued = 0
+
+    stop = asyncio.Event()
+    deadline = time.perf_counter() + duration
+
+    async def worker(worker_rng: random.Random):
+        nonlocal issued
+        while time.perf_counter() < deadline:
+            if max_requests is not None and issued >= max_requests:
+                break
+            issued += 1
+            endpoint = worker_rng.choices(endpoints, weights)[0]
+            start = time.perf_counter()
+            try:
+                if endpoint == "/health":
+                    response = await client.get(endpoint)
+                else:
+                    size = worker_rng.choice(file_sizes)
+                    response = await client.post(
+                        endpoint,
+                        files={"file": ("transactions.txt", files[size])},
+                        data=form,
+                    )
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            latencies[endpoint].append((time.perf_counter() - start) * 1000)
+            if not ok:
+                errors[endpoint] += 1
+            # In-process requests complete without ever suspending, so give
+            # the health probe and lag monitor a turn between requests
+            await asyncio.sleep(0)
+
+    monitors = [asyncio.create_task(probe_health(client, health_interval, health_samples, stop))]
+    if measure_loop_lag:
+        monitors.append(asyncio.create_task(monitor_event_loop_lag(lag_interval, lag_samples, stop)))
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(random.Random(seed + i + 1)) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await asyncio.gather(*monitors)
+
+    total_requests = sum(len(v) for v in latencies.values())
+    all_latencies = [ms for v in latencies.values() for ms in v]
+    return {
+        "elapsed_s": elapsed,
+        "total_requests": total_requests,
+        "total_errors": sum(errors.values()),
+        "throughput_rps": total_requests / elapsed if elapsed > 0 else None,
+        "latency": summarize_latencies(all_latencies),
+        "endpoints": {
+            e: {
+                **summarize_latencies(latencies[e]),
+                "errors": errors[e],
+                "throughput_rps": len(latencies[e]) / elapsed if elapsed > 0 else None,
+            }
+            for e in endpoints
+        },
+        "health_probe": summarize_latencies(health_samples),
+        "event_loop_lag": summarize_latencies(lag_samples) if measure_loop_lag else None,
+    }
+
+
+def parse_weights(value: str) -> Dict[str, float]:
+    """Parse "process-file=2,health=1" into endpoint weights"""
+    weights = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        endpoint = "/" + name.strip().lstrip("/")
+        if endpoint not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint: {name}")
+        weights[endpoint] = float(weight or 1)
+    return weights
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load test the Cash Register API")
+    parser.add_argument("--url", help="Base URL of a running API; runs in-process if omitted")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run for")
+    parser.add_argument("--max-requests", type=int, help="Stop after this many requests")
+    parser.add_argument("--file-sizes", default="10,100,1000",
+                        help="Comma-separated lines per uploaded file")
+    parser.add_argument("--random-ratio", type=float, default=0.33,
+                        help="Fraction of lines that take the random change path")
+    parser.add_argument("--random-mode", choices=["coin", "uniform"], default="coin")
+    parser.add_argument("--divisor", type=int, default=3)
+    parser.add_argument("--locale", default="en-US")
+    parser.add_argument("--mix", type=parse_weights,
+                        default="process-file=1,process-file-detailed=1,health=1",
+                        help="Endpoint weights, e.g. process-file=2,health=1")
+    parser.add_argument("--health-interval", type=float, default=0.1)
+    parser.add_argument("--lag-interval", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    return parser.parse_args(argv)
+
+
+async def run_from_args(args: argparse.Namespace) -> dict:
+    if args.url:
+        transport = None
+        base_url = args.url
+    else:
+        from app.main import app
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://loadtest"
+
+    limits = httpx.Limits(max_connections=args.concurrency + 1)
+    async with httpx.AsyncClient(transport=transport, base_url=base_url,
+                                 limits=limits, timeout=60.0) as client:
+        report = await run_load_test(
+            client,
+            concurrency=args.concurrency,
+            duration=args.duration,
+            max_requests=args.max_requests,
+            file_sizes=[int(s) for s in args.file_sizes.split(",")],
+            random_ratio=args.random_ratio,
+            random_mode=args.random_mode,
+            divisor=args.divisor,
+            locale=args.locale,
+            endpoint_weights=args.mix,
+            health_interval=args.health_interval,
+            lag_interval=args.lag_interval,
+            measure_loop_lag=not args.url,
+            seed=args.seed,
+        )
+
+    config = {k: v for k, v in vars(args).items() if k != "output"}
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "target": args.url or "in-process",
+        "config": config,
+        **report,
+    }
+
+
+def format_report(report: dict) -> str:
+    def row(name: str, stats: dict) -> str:
+        if not stats["count"]:
+            return f"  {name:<24} no samples"
+        return (f"  {name:<24} n={stats['count']:<6} p50={stats['p50_ms']:8.2f}ms "
+                f"p95={stats['p95_ms']:8.2f}ms p99={stats['p99_ms']:8.2f}ms "
+                f"max={stats['max_ms']:8.2f}ms")
+
+    lines = [
+        f"Target: {report['target']}",
+        f"Requests: {report['total_requests']} in {report['elapsed_s']:.2f}s "
+        f"({report['throughput_rps']:.1f} req/s), errors: {report['total_errors']}",
+        row("all requests", report["latency"]),
+    ]
+    for endpoint, stats in report["endpoints"].items():
+        lines.append(row(endpoint, stats))
+    lines.append(row("health probe", report["health_probe"]))
+    if report["event_loop_lag"] is None:
+        lines.append(f"  {'event loop lag':<24} not measured for remote targets; see health probe")
+    else:
+        lines.append(row("event loop lag", report["event_loop_lag"]))
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    report = asyncio.run(run_from_args(args))
+    print(format_report(report))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import pytest
 from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
 from app.main import app
 
 client = TestClient(app)
@@ -36,3 +37,192 @@ class TestAPI:
         assert "fr-FR" in data["locales"]
         assert data["default"] == "en-US"
     
+    def test_process_file_uniform_random_mode(self):
+        """Test uniform random mode and coin limit are accepted as form fields"""
+        response = client.post(
+            "/process-file-detailed",
+            files={"file": ("transactions.txt", b"3.33,5.00\n")},
+            data={"divisor": "3", "random_mode": "uniform", "max_coins": "10"},
+        )
+        assert response.status_code == 200
+        result = response.json()["results"][0]
+        assert result["success"]
+        assert result["is_random"]
+        assert sum(result["denominations"].values()) <= 10
+        
+        response = client.post(
+            "/process-file",
+            files={"file": ("transactions.txt", b"3.33,5.00\n")},
+            data={"random_mode": "biased"},
+        )
+        assert response.status_code == 422
+
+    def test_process_file_uniform_change_unavailable(self):
+        """Test an unreachable coin limit is reported as such, not as a number format error"""
+        response = client.post(
+            "/process-file",
+            files={"file": ("transactions.txt", b"3.33,5.00\n")},
+            data={"random_mode": "uniform", "max_coins": "1"},
+        )
+        assert response.text == "Line 1: Cannot make change for 167 cents with at most 1 coins"
+
+    def test_process_file_invalid_max_coins(self):
+        """Test bad coin limits are rejected before processing"""
+        for data in ({"random_mode": "uniform", "max_coins": "0"},
+                     {"random_mode": "uniform", "max_coins": "100000"},
+                     {"random_mode": "coin", "max_coins": "5"}):
+            response = client.post(
+                "/process-file",
+                files={"file": ("transactions.txt", b"3.33,5.00\n")},
+                data=data,
+            )
+            assert response.status_code == 400
+        
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            with client.websocket_connect("/ws/register?max_coins=5") as websocket:
+                websocket.receive_json()
+        assert exc_info.value.code == 1008
+    
+    def test_chunked_upload_matches_detailed(self):
+        """Test chunked upload results match the single-request detailed endpoint"""
+        content = b"2.12,3.00\n1.97,2.00\n1.50,1.50\nbad line\n5.00,10.00\n"
+        detailed = client.post(
+            "/process-file-detailed",
+            files={"file": ("transactions.txt", content)},
+            data={"locale": "en-US", "divisor": "7"},
+        ).json()
+        
+        response = client.post(
+            "/uploads", data={"total_size": str(len(content)), "locale": "en-US", "divisor": "7"}
+        )
+        assert response.status_code == 200
+        upload_id = response.json()["upload_id"]
+        
+        # Send the second half first, as a parallel upload might
+        response = client.put(f"/uploads/{upload_id}/chunks?offset=16", content=content[16:])
+        assert response.json()["results"] == []
+        assert response.json()["received_ranges"] == [[16, len(content)]]
+        
+        response = client.put(f"/uploads/{upload_id}/chunks?offset=0", content=content[:16])
+        data = response.json()
+        assert data["completed"]
+        assert data["results"] == detailed["results"]
+        
+        # A resend passing the client's cursor recovers results it is missing
+        response = client.put(f"/uploads/{upload_id}/chunks?offset=0&after_line=1", content=content[:16])
+        assert response.json()["results"] == detailed["results"][1:]
+        
+        response = client.get(f"/uploads/{upload_id}/results?after_line=3")
+        assert response.json()["results"] == detailed["results"][3:]
+        
+        response = client.delete(f"/uploads/{upload_id}")
+        assert response.status_code == 200
+        assert client.get(f"/uploads/{upload_id}").status_code == 404
+    
+    def test_chunked_upload_blank_lines_match_detailed(self):
+        """Test chunked upload numbers lines around blank lines like the detailed endpoint"""
+        content = b"\n\n2.12,3.00\n\n1.97,2.00\n\n"
+        detailed = client.post(
+            "/process-file-detailed",
+            files={"file": ("transactions.txt", content)},
+            data={"divisor": "7"},
+        ).json()
+        
+        upload_id = client.post(
+            "/uploads", data={"total_size": str(len(content)), "divisor": "7"}
+        ).json()["upload_id"]
+        data = client.put(f"/uploads/{upload_id}/chunks?offset=0", content=content).json()
+        assert data["results"] == detailed["results"]
+        assert data["total_lines"] == detailed["total_lines"]
+        client.delete(f"/uploads/{upload_id}")
+    
+    def test_chunked_upload_session_limit(self, monkeypatch):
+        """Test new uploads are refused while the worker is full"""
+        monkeypatch.setattr("app.uploads.MAX_UPLOAD_SESSIONS", 0)
+        response = client.post("/uploads", data={"total_size": "10"})
+        assert response.status_code == 429
+    
+    def test_chunked_upload_invalid_chunk(self):
+        """Test chunks past the declared size are rejected"""
+        upload_id = client.post("/uploads", data={"total_size": "4"}).json()["upload_id"]
+        response = client.put(f"/uploads/{upload_id}/chunks?offset=2", content=b"1234")
+        assert response.status_code == 400
+    
+    def test_chunked_upload_size_limits(self, monkeypatch):
+        """Test oversized uploads and chunks are rejected"""
+        response = client.post("/uploads", data={"total_size": str(10 ** 12)})
+        assert response.status_code == 400
+        
+        monkeypatch.setattr("app.main.MAX_CHUNK_SIZE", 4)
+        upload_id = client.post("/uploads", data={"total_size": "10"}).json()["upload_id"]
+        response = client.put(f"/uploads/{upload_id}/chunks?offset=0", content=b"1234567890")
+        assert response.status_code == 413
+    
+    def test_register_session_pipelined(self):
+        """Test websocket session answers pipelined transactions by id"""
+        with client.websocket_connect("/ws/register?locale=en-US&divisor=3") as websocket:
+            websocket.send_json({"id": "a", "amount_owed": 2.12, "amount_paid": 3.00})
+            websocket.send_json({"id": "b", "amount_owed": 1.50, "amount_paid": 1.50})
+            websocket.send_json({"id": "c", "amount_owed": 5.00, "amount_paid": 3.00})
+
+            first = websocket.receive_json()
+            assert first["id"] == "a"
+            assert first["success"]
+            assert first["change_cents"] == 88
+            assert first["formatted_change"] == "3 quarters,1 dime,3 pennies"
+
+            second = websocket.receive_json()
+            assert second["id"] == "b"
+            assert second["formatted_change"] == "No change"
+
+            third = websocket.receive_json()
+            assert third["id"] == "c"
+            assert not third["success"]
+            assert third["error"] == "Insufficient payment"
+
+    def test_register_session_invalid_message(self):
+        """Test websocket session reports bad messages without closing"""
+        with client.websocket_connect("/ws/register") as websocket:
+            websocket.send_json({"id": 1, "amount_owed": "abc", "amount_paid": 1.00})
+            assert not websocket.receive_json()["success"]
+
+            websocket.send_json({"id": 2, "amount_paid": 1.00})
+            data = websocket.receive_json()
+            assert data["id"] == 2
+            assert "amount_owed" in data["error"]
+
+            websocket.send_json({"id": 3, "amount_owed": 0.99, "amount_paid": 1.00})
+            assert websocket.receive_json()["formatted_change"] == "1 penny"
+
+    def test_register_session_change_limit(self):
+        """Test websocket session rejects change above the per-message limit"""
+        with client.websocket_connect("/ws/register") as websocket:
+            websocket.send_json({"id": "big", "amount_owed": 1.00, "amount_paid": 1000000.00})
+            data = websocket.receive_json()
+            assert data["id"] == "big"
+            assert not data["success"]
+            assert "session limit" in data["error"]
+            
+            websocket.send_text('{"id": "inf", "amount_owed": 1, "amount_paid": Infinity}')
+            assert not websocket.receive_json()["success"]
+            
+            websocket.send_json({"id": "ok", "amount_owed": 50.02, "amount_paid": 200.02})
+            assert websocket.receive_json()["formatted_change"] == "1 hundred dollar bill,1 fifty dollar bill"
+
+    def test_register_session_binary_frame(self):
+        """Test websocket session reports binary frames without closing"""
+        with client.websocket_connect("/ws/register") as websocket:
+            websocket.send_bytes(b'{"id": 1}')
+            data = websocket.receive_json()
+            assert not data["success"]
+            assert "expected JSON text" in data["error"]
+            
+            websocket.send_json({"id": 2, "amount_owed": 0.99, "amount_paid": 1.00})
+            assert websocket.receive_json()["formatted_change"] == "1 penny"
+
+    def test_register_session_unsupported_locale(self):
+        """Test websocket session rejects unsupported locale at connect time"""
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            with client.websocket_connect("/ws/register?locale=xx-XX") as websocket:
+                websocket.receive_json()
+        assert exc_info.value.code == 1008
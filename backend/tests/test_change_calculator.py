@@ -1,5 +1,5 @@
 import pytest
-from app.change_calculator import ChangeCalculator
+from app.change_calculator import MIN_CHANGE_TABLE_CENTS, ChangeCalculator, get_calculator, validate_random_options
 
 
 class TestChangeCalculator:
@@ -135,3 +135,67 @@ class TestChangeCalculator:
         denominations, is_random = self.calculator_usd.calculate_change(100.00, 200.00)
         assert not is_random
         assert len(denominations) > 0
+
+    def test_minimum_change_table_reused(self):
+        """Test the minimum-change table grows once and large amounts still work"""
+        calculator = ChangeCalculator("en-US")
+        assert calculator._calculate_minimum_change(15000) == {
+            "hundred dollar bill": 1, "fifty dollar bill": 1
+        }
+        table = calculator._min_coins
+        assert len(table) == 15001
+
+        calculator._calculate_minimum_change(88)
+        assert calculator._min_coins is table
+        assert len(table) == 15001
+
+        beyond_table = MIN_CHANGE_TABLE_CENTS + 101
+        denominations = calculator._calculate_minimum_change(beyond_table)
+        assert denominations["hundred dollar bill"] == beyond_table // 10000
+        assert denominations["dollar"] == 1
+        assert denominations["penny"] == 1
+        assert len(calculator._min_coins) == 15001
+
+    def test_get_calculator_shared(self):
+        """Test shared calculators are reused per locale"""
+        assert get_calculator("en-US") is get_calculator("en-US")
+        assert get_calculator("fr-FR").currency_config.locale == "fr-FR"
+        
+        with pytest.raises(ValueError, match="Unsupported locale"):
+            get_calculator("xx-XX")
+    
+    def test_uniform_random_change(self):
+        """Test uniform random mode returns valid change within the coin limit"""
+        # 333 % 3 == 0, so random mode applies
+        denominations, is_random = self.calculator_usd.calculate_change(
+            3.33, 5.00, random_mode="uniform", max_coins=10, seed=7
+        )
+        
+        assert is_random
+        values = {names[0]: value for value, names in self.calculator_usd.denomination_names.items()}
+        assert sum(values[name] * count for name, count in denominations.items()) == 167
+        assert sum(denominations.values()) <= 10
+        
+        # Same seed gives the same breakdown
+        assert self.calculator_usd.calculate_change(
+            3.33, 5.00, random_mode="uniform", max_coins=10, seed=7
+        )[0] == denominations
+    
+    def test_uniform_random_change_unreachable_limit(self):
+        """Test a coin limit above the most coins possible uses the unlimited table"""
+        # 3 cents can never need more than 3 coins, so a limit of 100 is dropped
+        denominations, is_random = self.calculator_usd.calculate_change(
+            0.99, 1.02, random_mode="uniform", max_coins=100, seed=1
+        )
+        assert is_random
+        assert sum(denominations.values()) <= 3
+    
+    def test_validate_random_options(self):
+        """Test coin limits are only accepted for uniform random change"""
+        validate_random_options("coin", None)
+        validate_random_options("uniform", 5)
+        
+        with pytest.raises(ValueError, match="requires random_mode=uniform"):
+            validate_random_options("coin", 5)
+        with pytest.raises(ValueError, match="between 1 and"):
+            validate_random_options("uniform", 0)
@@ -0,0 +1,79 @@
+import asyncio
+import json
+import random
+
+import httpx
+from app.main import app
+from scripts.load_test import build_transaction_file, format_report, main, percentile, run_load_test
+
+
+class TestLoadTest:
+    """Test cases for the load-testing harness"""
+    
+    def test_build_transaction_file_random_ratio(self):
+        """Test generated files hit the random path at the requested ratio"""
+        content = build_transaction_file(1000, 0.25, 3, random.Random(0)).decode()
+        owed = [int(round(float(line.split(",")[0]) * 100)) for line in content.split("\n")]
+        
+        random_lines = len([cents for cents in owed if cents % 3 == 0])
+        assert 200 < random_lines < 300
+    
+    def test_percentile(self):
+        """Test nearest-rank percentiles"""
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile([], 50) is None
+    
+    def test_run_load_test_in_process(self):
+        """Test an in-process run reports every endpoint and samples throughout"""
+        async def run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+                return await run_load_test(
+                    client, concurrency=3, duration=1.0, file_sizes=[3],
+                    health_interval=0.1, lag_interval=0.05
+                )
+        
+        report = asyncio.run(run())
+        
+        assert report["total_requests"] > 12
+        assert report["total_errors"] == 0
+        assert set(report["endpoints"]) == {"/process-file", "/process-file-detailed", "/health"}
+        assert report["latency"]["p50_ms"] <= report["latency"]["p99_ms"]
+        
+        # Workers yield between requests, so the monitors keep their schedule
+        # rather than running once when the workers finish
+        assert report["health_probe"]["count"] >= report["elapsed_s"] / 0.1 / 2
+        assert report["event_loop_lag"]["count"] >= report["elapsed_s"] / 0.05 / 2
+        assert report["event_loop_lag"]["max_ms"] < report["elapsed_s"] * 1000 / 2
+    
+    def test_run_load_test_without_loop_lag(self):
+        """Test loop lag is left out when it would not describe the server"""
+        async def run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+                return await run_load_test(
+                    client, concurrency=1, duration=5.0, max_requests=2,
+                    endpoint_weights={"/health": 1.0}, measure_loop_lag=False
+                )
+        
+        report = asyncio.run(run())
+        
+        assert report["event_loop_lag"] is None
+        assert report["health_probe"]["count"] > 0
+        assert "not measured" in format_report({**report, "target": "remote"})
+    
+    def test_main_writes_json(self, tmp_path):
+        """Test the command line entry point saves a JSON report"""
+        output = tmp_path / "run.json"
+        main(["--duration", "1", "--concurrency", "2", "--file-sizes", "2",
+              "--mix", "process-file=1,health=1", "--health-interval", "0.1",
+              "--lag-interval", "0.05", "--output", str(output)])
+        
+        report = json.loads(output.read_text())
+        assert report["target"] == "in-process"
+        assert report["config"]["duration"] == 1.0
+        assert set(report["endpoints"]) == {"/process-file", "/health"}
+        assert report["health_probe"]["count"] >= report["elapsed_s"] / 0.1 / 2
+        assert report["event_loop_lag"]["count"] >= report["elapsed_s"] / 0.05 / 2
@@ -0,0 +1,186 @@
+import pytest
+from app import uploads
+from app.uploads import UploadLimitError, UploadSession, create_upload_session, get_upload_session
+
+
+SAMPLE = b"2.12,3.00\n1.97,2.00\nbad line\n1.50,1.50\n5.00,10.00"
+
+
+class TestUploadSession:
+    """Test cases for resumable chunked upload sessions"""
+    
+    def test_in_order_chunks(self):
+        """Test lines are processed as contiguous chunks arrive"""
+        session = UploadSession("en-US", 3, len(SAMPLE))
+        
+        results = session.add_chunk(0, SAMPLE[:14])
+        assert [r["line_number"] for r in results] == [1]
+        assert results[0]["formatted_change"] == "3 quarters,1 dime,3 pennies"
+        
+        results = session.add_chunk(14, SAMPLE[14:])
+        assert [r["line_number"] for r in results] == [2, 3, 4, 5]
+        assert session.completed
+        
+        status = session.status()
+        assert status["total_lines"] == 5
+        assert status["processed_lines"] == 4
+        assert status["error_lines"] == 1
+    
+    def test_out_of_order_chunks(self):
+        """Test chunks past a gap wait until the gap is filled"""
+        session = UploadSession("en-US", 3, len(SAMPLE))
+        
+        assert session.add_chunk(20, SAMPLE[20:]) == []
+        assert session.received_ranges() == [(20, len(SAMPLE))]
+        assert not session.completed
+        
+        results = session.add_chunk(0, SAMPLE[:20])
+        assert [r["line_number"] for r in results] == [1, 2, 3, 4, 5]
+        assert session.received_ranges() == [(0, len(SAMPLE))]
+        assert session.completed
+    
+    def test_resent_chunk_ignored(self):
+        """Test resending an already received chunk does not duplicate results"""
+        session = UploadSession("en-US", 3, len(SAMPLE))
+        session.add_chunk(0, SAMPLE[:20])
+        
+        assert session.add_chunk(0, SAMPLE[:20]) == []
+        assert len(session.results) == 2
+    
+    def test_overlapping_chunks(self):
+        """Test overlapping chunks keep only new bytes and still complete"""
+        data = SAMPLE[:29]
+        session = UploadSession("en-US", 3, len(data))
+        
+        session.add_chunk(5, data[5:15])
+        session.add_chunk(0, data[0:10])
+        assert session.received_ranges() == [(0, 15)]
+        
+        session.add_chunk(15, data[15:29])
+        assert session.completed
+        assert session.received_ranges() == [(0, 29)]
+        assert [r["line_number"] for r in session.results] == [1, 2, 3]
+    
+    def test_differently_sized_chunks(self):
+        """Test resuming with a different chunk size fills only the gaps"""
+        session = UploadSession("en-US", 3, len(SAMPLE))
+        session.add_chunk(10, SAMPLE[10:20])
+        session.add_chunk(30, SAMPLE[30:40])
+        assert session.received_ranges() == [(10, 20), (30, 40)]
+        
+        for offset in range(0, len(SAMPLE), 16):
+            session.add_chunk(offset, SAMPLE[offset:offset + 16])
+        
+        assert session.completed
+        assert session.pending == {}
+        assert [r["line_number"] for r in session.results] == [1, 2, 3, 4, 5]
+    
+    def test_results_after_lost_response(self):
+        """Test results of a chunk can be fetched again after its response was lost"""
+        session = UploadSession("en-US", 3, len(SAMPLE))
+        assert len(session.add_chunk(0, SAMPLE[:20])) == 2
+        
+        # The retry is a resend, so its results have to come from the cursor
+        assert session.add_chunk(0, SAMPLE[:20]) == []
+        assert [r["line_number"] for r in session.results_after(0)] == [1, 2]
+        assert [r["line_number"] for r in session.results_after(1)] == [2]
+    
+    def test_retained_results_limit(self, monkeypatch):
+        """Test processing pauses on unacknowledged results and resumes on acknowledgement"""
+        monkeypatch.setattr(uploads, "MAX_RETAINED_RESULTS", 2)
+        session = UploadSession("en-US", 3, len(SAMPLE))
+        
+        results = session.add_chunk(0, SAMPLE)
+        assert [r["line_number"] for r in results] == [1, 2]
+        assert not session.completed
+        assert session.received_ranges() == [(0, len(SAMPLE))]
+        
+        # Acknowledging nothing new keeps processing paused
+        session.acknowledge(0)
+        assert len(session.results) == 2
+        
+        session.acknowledge(2)
+        assert [r["line_number"] for r in session.results_after(2)] == [3, 4]
+        
+        session.acknowledge(4)
+        assert [r["line_number"] for r in session.results] == [5]
+        assert session.completed
+        
+        status = session.status()
+        assert status["total_lines"] == 5
+        assert status["processed_lines"] == 4
+        assert status["error_lines"] == 1
+    
+    def test_blank_lines_numbered_like_process_file(self):
+        """Test leading and trailing blank lines are not counted, inner ones are"""
+        data = b"\n  \n2.12,3.00\n\n1.97,2.00\n\n \n"
+        session = UploadSession("en-US", 3, len(data))
+        
+        for offset in range(len(data)):
+            session.add_chunk(offset, data[offset:offset + 1])
+        
+        assert session.completed
+        assert [r["line_number"] for r in session.results] == [1, 3]
+        assert session.status()["total_lines"] == 3
+    
+    def test_size_limits(self):
+        """Test declared and chunk sizes are limited"""
+        with pytest.raises(ValueError, match="Total size exceeds"):
+            UploadSession("en-US", 3, uploads.MAX_UPLOAD_SIZE + 1)
+        
+        session = UploadSession("en-US", 3, uploads.MAX_CHUNK_SIZE + 1)
+        with pytest.raises(ValueError, match="Chunk exceeds"):
+            session.add_chunk(0, b"1" * (uploads.MAX_CHUNK_SIZE + 1))
+    
+    def test_expired_sessions_discarded_on_access(self):
+        """Test idle sessions are dropped when looked up"""
+        session = create_upload_session("en-US", 3, 10)
+        assert get_upload_session(session.upload_id) is session
+        
+        session.last_activity -= uploads.UPLOAD_SESSION_TTL_SECONDS + 1
+        assert get_upload_session(session.upload_id) is None
+        assert session.upload_id not in uploads.upload_sessions
+    
+    def test_completed_sessions_expire_sooner(self):
+        """Test finished sessions are dropped once their shorter TTL passes"""
+        session = create_upload_session("en-US", 3, 0)
+        assert session.completed
+        
+        session.last_activity -= uploads.COMPLETED_SESSION_TTL_SECONDS + 1
+        assert get_upload_session(session.upload_id) is None
+    
+    def test_session_limits(self, monkeypatch):
+        """Test the worker caps open sessions and outstanding upload bytes"""
+        monkeypatch.setattr(uploads, "upload_sessions", {})
+        monkeypatch.setattr(uploads, "MAX_UPLOAD_SESSIONS", 2)
+        monkeypatch.setattr(uploads, "MAX_OUTSTANDING_UPLOAD_BYTES", 100)
+        
+        create_upload_session("en-US", 3, 60)
+        with pytest.raises(UploadLimitError, match="upload data"):
+            create_upload_session("en-US", 3, 41)
+        
+        create_upload_session("en-US", 3, 40)
+        with pytest.raises(UploadLimitError, match="Too many uploads"):
+            create_upload_session("en-US", 3, 0)
+    
+    def test_chunk_outside_file(self):
+        """Test chunks beyond the declared size are rejected"""
+        session = UploadSession("en-US", 3, 10)
+        
+        with pytest.raises(ValueError, match="outside of declared file size"):
+            session.add_chunk(5, b"1234567890")
+    
+    def test_empty_file(self):
+        """Test an empty upload is complete immediately"""
+        session = UploadSession("en-US", 3, 0)
+        
+        assert session.completed
+        assert session.results == []
+    
+    def test_invalid_options(self):
+        """Test invalid locale or divisor is rejected"""
+        with pytest.raises(ValueError, match="Unsupported locale"):
+            UploadSession("xx-XX", 3, 10)
+        
+        with pytest.raises(ValueError, match="Divisor"):
+            UploadSession("en-US", 0, 10)
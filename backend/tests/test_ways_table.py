@@ -0,0 +1,107 @@
+import random
+from collections import Counter
+
+import pytest
+from app.ways_table import MAX_COINS_LIMIT, UniformChangeError, WaysTable, get_ways_table
+
+
+USD_VALUES = [10000, 5000, 2000, 1000, 500, 100, 25, 10, 5, 1]
+
+
+def brute_force_count(amount, values, max_coins=None):
+    """Count breakdowns by enumerating every coin count"""
+    def count(i, remaining, coins):
+        if i == len(values):
+            return 1 if remaining == 0 and (max_coins is None or coins <= max_coins) else 0
+        return sum(count(i + 1, remaining - j * values[i], coins + j)
+                   for j in range(remaining // values[i] + 1))
+    return count(0, amount, 0)
+
+
+class TestWaysTable:
+    """Test cases for the ways-count table and uniform sampling"""
+    
+    def test_count_matches_brute_force(self):
+        """Test counts with and without a coin limit"""
+        values = [100, 25, 10, 5, 1]
+        table = WaysTable(values)
+        capped = WaysTable(values, coin_limited=True)
+        
+        for amount in range(0, 130, 7):
+            assert table.count(amount) == brute_force_count(amount, values)
+            assert capped.count(amount, max_coins=6) == brute_force_count(amount, values, 6)
+    
+    def test_layers_grow_independently(self):
+        """Test one coin-limited table serves limits requested in any order"""
+        values = [100, 25, 10, 5, 1]
+        table = WaysTable(values, coin_limited=True)
+        table.count(50, max_coins=3)
+        table.count(120, max_coins=9)
+        table.count(200, max_coins=2)
+        table.count(30, max_coins=12)
+        
+        for amount in range(0, 121, 5):
+            for max_coins in (2, 3, 9, 12):
+                assert table.count(amount, max_coins) == brute_force_count(amount, values, max_coins)
+    
+    def test_sample_is_valid(self):
+        """Test samples add up and respect the coin limit"""
+        table = WaysTable(USD_VALUES, coin_limited=True)
+        rng = random.Random(0)
+        
+        for _ in range(200):
+            counts = table.sample(167, rng, max_coins=8)
+            assert sum(c * v for c, v in zip(counts, USD_VALUES)) == 167
+            assert sum(counts) <= 8
+    
+    def test_sample_is_uniform(self):
+        """Test every breakdown of 10 cents is drawn about equally often"""
+        # 10 cents: 1 dime, 2 nickels, 1 nickel + 5 pennies, 10 pennies
+        table = WaysTable([25, 10, 5, 1])
+        rng = random.Random(42)
+        
+        draws = Counter(tuple(table.sample(10, rng)) for _ in range(8000))
+        
+        assert len(draws) == 4
+        assert all(1700 < n < 2300 for n in draws.values())
+    
+    def test_sample_impossible(self):
+        """Test sampling fails when no breakdown fits the coin limit"""
+        table = WaysTable(USD_VALUES, coin_limited=True)
+        
+        with pytest.raises(UniformChangeError, match="at most 2 coins"):
+            table.sample(3, max_coins=2)
+    
+    def test_invalid_max_coins(self):
+        """Test coin limit must be positive"""
+        table = WaysTable(USD_VALUES, coin_limited=True)
+        
+        with pytest.raises(ValueError, match="max_coins"):
+            table.count(10, max_coins=0)
+        
+        with pytest.raises(ValueError, match="max_coins"):
+            table.count(10, max_coins=MAX_COINS_LIMIT + 1)
+    
+    def test_everyday_amounts(self):
+        """Test change of tens or hundreds of dollars fits within the table limit"""
+        rng = random.Random(3)
+        for amount, max_coins in ((40000, None), (2000, 10), (500, 50), (1000, MAX_COINS_LIMIT)):
+            table = WaysTable(USD_VALUES, coin_limited=max_coins is not None)
+            counts = table.sample(amount, rng, max_coins=max_coins)
+            assert sum(c * v for c, v in zip(counts, USD_VALUES)) == amount
+            if max_coins is not None:
+                assert sum(counts) <= max_coins
+    
+    def test_table_size_limit(self):
+        """Test amounts that would grow the table past its limit are rejected"""
+        table = WaysTable(USD_VALUES, coin_limited=True)
+        
+        with pytest.raises(UniformChangeError, match="table size limit"):
+            table.count(10000, max_coins=MAX_COINS_LIMIT)
+        assert table.count(10000, max_coins=20) > 0
+    
+    def test_shared_table(self):
+        """Test tables are built once per locale, with coin layers kept together"""
+        assert get_ways_table("en-US") is get_ways_table("en-US")
+        assert get_ways_table("en-US", coin_limited=True) is get_ways_table("en-US", coin_limited=True)
+        assert get_ways_table("en-US", coin_limited=True) is not get_ways_table("en-US")
@@ -1,16 +1,31 @@
 import React, { useState } from 'react';
 import FileProcessor from './components/FileProcessor';
 import FileResults from './components/FileResults';
+import { formatResultsText } from './services/formatResults';
+import { ProcessingMode, TransactionResult, UploadStatus } from './types';
 
 function App() {
-  const [fileResults, setFileResults] = useState<string | null>(null);
+  const [fileResults, setFileResults] = useState<TransactionResult[] | null>(null);
+  const [resultsMode, setResultsMode] = useState<ProcessingMode>('simple');
+  const [uploadSummary, setUploadSummary] = useState<UploadStatus | null>(null);
   const [error, setError] = useState<string | null>(null);
 
-  const handleFileResults = (results: string) => {
-    setFileResults(results);
+  const handleFileStart = (mode: ProcessingMode) => {
+    setResultsMode(mode);
+    setFileResults([]);
+    setUploadSummary(null);
     setError(null);
   };
 
+  const handleFileResults = (results: TransactionResult[]) => {
+    // Batches arrive in line order
+    setFileResults((prev) => (prev ? [...prev, ...results] : prev));
+  };
+
+  const handleFileComplete = (summary: UploadStatus) => {
+    setUploadSummary(summary);
+  };
+
   const handleError = (errorMessage: string) => {
     setError(errorMessage);
     setFileResults(null);
@@ -18,7 +33,8 @@ function App() {
 
   const handleDownloadFileResults = () => {
     if (fileResults) {
-      const blob = new Blob([fileResults], { type: 'text/plain' });
+      const text = formatResultsText(fileResults, resultsMode, uploadSummary);
+      const blob = new Blob([text], { type: 'text/plain' });
       const url = URL.createObjectURL(blob);
       const a = document.createElement('a');
       a.href = url;
@@ -63,8 +79,20 @@ function App() {
         )}
 
         <div className="space-y-8">
-          <FileProcessor onResults={handleFileResults} onError={handleError} />
-          {fileResults && <FileResults results={fileResults} onDownload={handleDownloadFileResults} />}
+          <FileProcessor
+            onStart={handleFileStart}
+            onResults={handleFileResults}
+            onComplete={handleFileComplete}
+            onError={handleError}
+          />
+          {fileResults && (
+            <FileResults
+              results={fileResults}
+              mode={resultsMode}
+              summary={uploadSummary}
+              onDownload={handleDownloadFileResults}
+            />
+          )}
         </div>
       </main>
     </div>
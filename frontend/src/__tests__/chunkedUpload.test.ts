@@ -0,0 +1,149 @@
+import { uploadFileInChunks } from '../services/chunkedUpload';
+import { TransactionResult } from '../types';
+
+jest.mock('../services/api', () => ({
+  API_BASE_URL: 'http://localhost:8000',
+}));
+
+const result = (line_number: number): TransactionResult => ({
+  line_number,
+  input: '',
+  formatted_change: `change ${line_number}`,
+  success: true,
+});
+
+const status = (overrides: object = {}) => ({
+  upload_id: 'abc',
+  total_size: 30,
+  received_ranges: [],
+  processed_bytes: 0,
+  total_lines: 0,
+  processed_lines: 0,
+  error_lines: 0,
+  completed: false,
+  ...overrides,
+});
+
+const respond = (body: object) => Promise.resolve({ ok: true, status: 200, json: () => Promise.resolve(body) });
+
+const options = { locale: 'en-US' as const, divisor: 3, chunkSize: 10, concurrency: 1, retryDelayMs: 0 };
+
+describe('uploadFileInChunks', () => {
+  const file = new File(['a'.repeat(30)], 'transactions.txt');
+  let fetchMock: jest.Mock;
+
+  beforeEach(() => {
+    fetchMock = jest.fn();
+    global.fetch = fetchMock;
+  });
+
+  const calls = () => fetchMock.mock.calls.map(([url, init]) => `${init?.method ?? 'GET'} ${url}`);
+
+  test('retries a failed chunk and recovers results from the lost response', async () => {
+    let attempts = 0;
+    fetchMock.mockImplementation((url: string, init?: RequestInit) => {
+      if (init?.method === 'POST') {
+        return respond(status());
+      }
+      if (url.includes('/chunks?offset=0')) {
+        attempts += 1;
+        // The server processed the first attempt but the response was lost
+        return attempts === 1
+          ? Promise.reject(new Error('network'))
+          : respond({ ...status(), results: [result(1)] });
+      }
+      if (url.includes('/chunks')) {
+        return respond({ ...status(), results: [] });
+      }
+      return respond({ ...status({ completed: true }), results: [result(2)] });
+    });
+
+    const received: number[] = [];
+    await uploadFileInChunks(file, {
+      ...options,
+      onResults: (results) => received.push(...results.map((r) => r.line_number)),
+    });
+
+    expect(attempts).toBe(2);
+    expect(received).toEqual([1, 2]);
+    expect(calls()).toContain('PUT http://localhost:8000/uploads/abc/chunks?offset=10&after_line=1');
+    expect(calls()).toContain('GET http://localhost:8000/uploads/abc/results?after_line=1');
+    expect(calls()[calls().length - 1]).toBe('DELETE http://localhost:8000/uploads/abc');
+  });
+
+  test('keeps fetching results while the server releases them', async () => {
+    const batches = [[result(1)], [result(2)], [result(3)]];
+    fetchMock.mockImplementation((url: string, init?: RequestInit) => {
+      if (init?.method === 'POST') {
+        return respond(status());
+      }
+      if (init?.method === 'PUT' || init?.method === 'DELETE') {
+        return respond({ ...status(), results: [] });
+      }
+      const batch = batches.shift() ?? [];
+      return respond({ ...status({ completed: batches.length === 0 }), results: batch });
+    });
+
+    const received: number[] = [];
+    await uploadFileInChunks(file, {
+      ...options,
+      onResults: (results) => received.push(...results.map((r) => r.line_number)),
+    });
+
+    expect(received).toEqual([1, 2, 3]);
+    expect(calls().filter((c) => c.startsWith('GET'))).toEqual([
+      'GET http://localhost:8000/uploads/abc/results?after_line=0',
+      'GET http://localhost:8000/uploads/abc/results?after_line=1',
+      'GET http://localhost:8000/uploads/abc/results?after_line=2',
+    ]);
+  });
+
+  test('resumes a session and only sends missing chunks', async () => {
+    fetchMock.mockImplementation((url: string, init?: RequestInit) => {
+      if (url.endsWith('/uploads/abc')) {
+        return respond(status({ received_ranges: [[0, 20]] }));
+      }
+      if (init?.method === 'PUT') {
+        return respond({ ...status(), results: [] });
+      }
+      return respond({ ...status({ completed: true }), results: [result(1), result(2), result(3)] });
+    });
+
+    const received: number[] = [];
+    const progress: number[] = [];
+    await uploadFileInChunks(file, {
+      ...options,
+      uploadId: 'abc',
+      onProgress: (uploaded) => progress.push(uploaded),
+      onResults: (results) => received.push(...results.map((r) => r.line_number)),
+    });
+
+    expect(calls().filter((c) => c.startsWith('PUT'))).toEqual([
+      'PUT http://localhost:8000/uploads/abc/chunks?offset=20&after_line=0',
+    ]);
+    expect(calls().some((c) => c.startsWith('POST'))).toBe(false);
+    expect(progress).toEqual([20, 30]);
+    expect(received).toEqual([1, 2, 3]);
+  });
+
+  test('stops sending chunks once a chunk runs out of retries', async () => {
+    fetchMock.mockImplementation((url: string, init?: RequestInit) => {
+      if (init?.method === 'POST') {
+        return respond(status());
+      }
+      return Promise.reject(new Error('network'));
+    });
+
+    const sessions: string[] = [];
+    await expect(
+      uploadFileInChunks(file, { ...options, maxRetries: 1, onSession: (id) => sessions.push(id) })
+    ).rejects.toThrow('network');
+
+    expect(sessions).toEqual(['abc']);
+    expect(calls().filter((c) => c.startsWith('PUT'))).toEqual([
+      'PUT http://localhost:8000/uploads/abc/chunks?offset=0&after_line=0',
+      'PUT http://localhost:8000/uploads/abc/chunks?offset=0&after_line=0',
+    ]);
+    expect(calls().some((c) => c.startsWith('DELETE'))).toBe(false);
+  });
+});
@@ -0,0 +1,26 @@
+import { formatResultsText, formatSimpleResult } from '../services/formatResults';
+import { TransactionResult } from '../types';
+
+const ok = (line_number: number, formatted_change: string): TransactionResult => ({
+  line_number,
+  input: '',
+  formatted_change,
+  success: true,
+});
+
+const failed = (line_number: number, error: string): TransactionResult => ({
+  line_number,
+  input: '',
+  error,
+  success: false,
+});
+
+describe('formatResults', () => {
+  test('formats simple results like /process-file', () => {
+    expect(formatSimpleResult(ok(1, '3 pennies'))).toBe('3 pennies');
+    expect(formatSimpleResult(failed(2, 'Insufficient payment'))).toBe('Line 2: Insufficient payment');
+
+    const text = formatResultsText([ok(1, '3 pennies'), failed(2, 'Insufficient payment')], 'simple', null);
+    expect(text).toBe('3 pennies\nLine 2: Insufficient payment');
+  });
+});
@@ -1,65 +1,53 @@
 import React, { useState } from 'react';
-import { API_BASE_URL } from '../services/api';
+import { uploadFileInChunks } from '../services/chunkedUpload';
+import { Locale, ProcessingMode, TransactionResult, UploadStatus } from '../types';
 
 interface FileProcessorProps {
-  onResults: (results: string) => void;
+  onStart: (mode: ProcessingMode) => void;
+  onResults: (results: TransactionResult[]) => void;
+  onComplete: (status: UploadStatus) => void;
   onError: (error: string) => void;
 }
 
-const FileProcessor: React.FC<FileProcessorProps> = ({ onResults, onError }) => {
+const FileProcessor: React.FC<FileProcessorProps> = ({ onStart, onResults, onComplete, onError }) => {
   const [selectedFile, setSelectedFile] = useState<File | null>(null);
-  const [locale, setLocale] = useState<'en-US' | 'fr-FR'>('en-US');
+  const [locale, setLocale] = useState<Locale>('en-US');
   const [divisor, setDivisor] = useState(3);
   const [isProcessing, setIsProcessing] = useState(false);
-  const [processingMode, setProcessingMode] = useState<'simple' | 'detailed'>('simple');
+  const [processingMode, setProcessingMode] = useState<ProcessingMode>('simple');
+  const [uploadProgress, setUploadProgress] = useState<number | null>(null);
+  const [resumableUploadId, setResumableUploadId] = useState<string | null>(null);
 
   const handleFileSelect = (event: React.ChangeEvent<HTMLInputElement>) => {
     const file = event.target.files?.[0];
     if (file) {
       setSelectedFile(file);
+      setResumableUploadId(null);
     }
   };
 
-  const handleProcessFile = async () => {
+  const handleProcessFile = async (resume: boolean = false) => {
     if (!selectedFile) {
       onError('Please select a file first');
       return;
     }
 
     setIsProcessing(true);
+    setUploadProgress(0);
+    onStart(processingMode);
     try {
-      const formData = new FormData();
-      formData.append('file', selectedFile);
-      formData.append('locale', locale);
-      formData.append('divisor', divisor.toString());
-
-      const apiUrl = API_BASE_URL;
-      let response;
-      if (processingMode === 'simple') {
-        response = await fetch(`${apiUrl}/process-file`, {
-          method: 'POST',
-          body: formData,
-        });
-        
-        if (!response.ok) {
-          throw new Error(`HTTP error! status: ${response.status}`);
-        }
-        
-        const result = await response.text();
-        onResults(result);
-      } else {
-        response = await fetch(`${apiUrl}/process-file-detailed`, {
-          method: 'POST',
-          body: formData,
-        });
-        
-        if (!response.ok) {
-          throw new Error(`HTTP error! status: ${response.status}`);
-        }
-        
-        const result = await response.json();
-        onResults(JSON.stringify(result, null, 2));
-      }
+      const status = await uploadFileInChunks(selectedFile, {
+        locale,
+        divisor,
+        uploadId: resume ? resumableUploadId : null,
+        onSession: setResumableUploadId,
+        onProgress: (uploadedBytes, totalBytes) => {
+          setUploadProgress(totalBytes > 0 ? uploadedBytes / totalBytes : 1);
+        },
+        onResults,
+      });
+      setResumableUploadId(null);
+      onComplete(status);
     } catch (error) {
       onError(error instanceof Error ? error.message : 'An error occurred');
     } finally {
@@ -152,7 +140,10 @@ const FileProcessor: React.FC<FileProcessorProps> = ({ onResults, onError }) =>
           <select
             id="locale"
             value={locale}
-            onChange={(e) => setLocale(e.target.value as 'en-US' | 'fr-FR')}
+            onChange={(e) => {
+              setLocale(e.target.value as Locale);
+              setResumableUploadId(null);
+            }}
             className="w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-primary-500"
           >
             <option value="en-US">US Dollar (en-US)</option>
@@ -170,6 +161,7 @@ const FileProcessor: React.FC<FileProcessorProps> = ({ onResults, onError }) =>
             value={divisor}
             onChange={(e) => {
               const value = e.target.value;
+              setResumableUploadId(null);
               if (value === '') {
                 setDivisor(3); // Reset to default when cleared
               } else {
@@ -192,7 +184,7 @@ const FileProcessor: React.FC<FileProcessorProps> = ({ onResults, onError }) =>
           <select
             id="mode"
             value={processingMode}
-            onChange={(e) => setProcessingMode(e.target.value as 'simple' | 'detailed')}
+            onChange={(e) => setProcessingMode(e.target.value as ProcessingMode)}
             className="w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-primary-500"
           >
             <option value="simple">Simple (formatted change only)</option>
@@ -201,15 +193,39 @@ const FileProcessor: React.FC<FileProcessorProps> = ({ onResults, onError }) =>
         </div>
       </div>
 
+      {/* Upload Progress */}
+      {uploadProgress !== null && (
+        <div className="mb-4">
+          <div className="flex justify-between text-sm text-gray-600 mb-1">
+            <span>{isProcessing ? 'Uploading...' : 'Uploaded'}</span>
+            <span>{Math.round(uploadProgress * 100)}%</span>
+          </div>
+          <div className="w-full bg-gray-200 rounded-full h-2">
+            <div
+              className="bg-primary-600 h-2 rounded-full"
+              style={{ width: `${uploadProgress * 100}%` }}
+            />
+          </div>
+        </div>
+      )}
+
       {/* Process Button */}
       <div className="flex gap-3">
         <button
-          onClick={handleProcessFile}
+          onClick={() => handleProcessFile()}
           disabled={!selectedFile || isProcessing}
           className="flex-1 bg-primary-600 text-white py-2 px-4 rounded-md hover:bg-primary-700 focus:outline-none focus:ring-2 focus:ring-primary-500 disabled:opacity-50 disabled:cursor-not-allowed"
         >
           {isProcessing ? 'Processing...' : 'Process File'}
         </button>
+        {resumableUploadId && !isProcessing && (
+          <button
+            onClick={() => handleProcessFile(true)}
+            className="flex-1 bg-white text-primary-700 border border-primary-600 py-2 px-4 rounded-md hover:bg-primary-50 focus:outline-none focus:ring-2 focus:ring-primary-500"
+          >
+            Resume Upload
+          </button>
+        )}
       </div>
     </div>
   );
@@ -1,39 +1,61 @@
 import React from 'react';
+import { formatSimpleResult } from '../services/formatResults';
+import { ProcessingMode, TransactionResult, UploadStatus } from '../types';
+
+// Rows rendered on screen; the download always contains every line
+export const MAX_DISPLAYED_RESULTS = 500;
 
 interface FileResultsProps {
-  results: string;
+  results: TransactionResult[];
+  mode: ProcessingMode;
+  summary: UploadStatus | null;
   onDownload: () => void;
 }
 
-const FileResults: React.FC<FileResultsProps> = ({ results, onDownload }) => {
-  const isJson = results.trim().startsWith('{');
-  
+const FileResults: React.FC<FileResultsProps> = ({ results, mode, summary, onDownload }) => {
+  const isJson = mode === 'detailed';
+  const displayed = results.slice(0, MAX_DISPLAYED_RESULTS);
+
   return (
     <div className="bg-white p-6 rounded-lg shadow-md">
       <div className="flex items-center justify-between mb-4">
         <h2 className="text-xl font-semibold text-gray-800">File Processing Results</h2>
         <button
           onClick={onDownload}
-          className="bg-green-600 text-white px-4 py-2 rounded-md hover:bg-green-700 focus:outline-none focus:ring-2 focus:ring-green-500"
+          disabled={!summary}
+          className="bg-green-600 text-white px-4 py-2 rounded-md hover:bg-green-700 focus:outline-none focus:ring-2 focus:ring-green-500 disabled:opacity-50 disabled:cursor-not-allowed"
         >
           Download Results
         </button>
       </div>
-      
+
       <div className="bg-gray-50 p-4 rounded-lg">
         <div className="mb-2">
           <span className="text-sm font-medium text-gray-600">Output Format:</span>
           <span className="text-sm text-gray-700">{isJson ? 'JSON (Detailed)' : 'Text (Simple)'}</span>
         </div>
         <div className="mb-4">
-          <span className="text-sm font-medium text-gray-600">Results Length:</span>
-          <span className="text-sm text-gray-700">{results.length} characters</span>
+          <span className="text-sm font-medium text-gray-600">Results:</span>
+          <span className="text-sm text-gray-700">
+            {results.length} lines
+            {summary ? ` (${summary.error_lines} errors)` : ' - still processing'}
+          </span>
         </div>
-        
+
         <div className="bg-white border rounded-lg p-4 max-h-96 overflow-y-auto">
-          <pre className="text-sm text-gray-800 whitespace-pre-wrap font-mono">
-            {results}
-          </pre>
+          {displayed.map((result) => (
+            <pre
+              key={result.line_number}
+              className={`text-sm whitespace-pre-wrap font-mono ${result.success ? 'text-gray-800' : 'text-red-700'}`}
+            >
+              {isJson ? JSON.stringify(result) : formatSimpleResult(result)}
+            </pre>
+          ))}
+          {results.length > displayed.length && (
+            <p className="mt-2 text-sm text-gray-500">
+              Showing the first {displayed.length} of {results.length} lines. Download the results to see them all.
+            </p>
+          )}
         </div>
       </div>
     </div>
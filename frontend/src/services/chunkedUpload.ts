@@ -0,0 +1,165 @@
+import { API_BASE_URL } from './api';
+import { Locale, TransactionResult, UploadStatus } from '../types';
+
+export const DEFAULT_CHUNK_SIZE = 256 * 1024;
+export const DEFAULT_CONCURRENCY = 4;
+export const DEFAULT_MAX_RETRIES = 3;
+export const DEFAULT_RETRY_DELAY_MS = 500;
+
+export interface ChunkedUploadOptions {
+  locale: Locale;
+  divisor: number;
+  chunkSize?: number;
+  concurrency?: number;
+  maxRetries?: number;
+  // Delay before the first retry; doubles on each further attempt
+  retryDelayMs?: number;
+  // Id of an earlier, interrupted upload of the same file to resume
+  uploadId?: string | null;
+  onSession?: (uploadId: string) => void;
+  onProgress?: (uploadedBytes: number, totalBytes: number) => void;
+  onResults?: (results: TransactionResult[]) => void;
+}
+
+const isReceived = (start: number, end: number, ranges: [number, number][]) =>
+  ranges.some(([rangeStart, rangeEnd]) => rangeStart <= start && end <= rangeEnd);
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+async function requestJson<T>(url: string, init?: RequestInit): Promise<T> {
+  const response = await fetch(url, init);
+  if (!response.ok) {
+    throw new Error(`HTTP error! status: ${response.status}`);
+  }
+  return response.json();
+}
+
+async function openSession(file: File, options: ChunkedUploadOptions): Promise<UploadStatus> {
+  if (options.uploadId) {
+    const response = await fetch(`${API_BASE_URL}/uploads/${options.uploadId}`);
+    if (response.ok) {
+      const status: UploadStatus = await response.json();
+      if (status.total_size === file.size) {
+        return status;
+      }
+    }
+  }
+
+  const formData = new FormData();
+  formData.append('total_size', file.size.toString());
+  formData.append('locale', options.locale);
+  formData.append('divisor', options.divisor.toString());
+  return requestJson<UploadStatus>(`${API_BASE_URL}/uploads`, {
+    method: 'POST',
+    body: formData,
+  });
+}
+
+/**
+ * Upload a file in parallel slices, resuming an earlier session when possible.
+ *
+ * Results are reported through onResults, in line order and exactly once, as
+ * soon as the server has processed the lines. Every request passes the last
+ * line number seen, so the server returns all results after it and can drop
+ * the ones before it; results from a response lost to a failed request arrive
+ * with the next one. The session is deleted once every result has arrived.
+ */
+export async function uploadFileInChunks(
+  file: File,
+  options: ChunkedUploadOptions
+): Promise<UploadStatus> {
+  const chunkSize = options.chunkSize ?? DEFAULT_CHUNK_SIZE;
+  const concurrency = options.concurrency ?? DEFAULT_CONCURRENCY;
+  const maxRetries = options.maxRetries ?? DEFAULT_MAX_RETRIES;
+  const retryDelayMs = options.retryDelayMs ?? DEFAULT_RETRY_DELAY_MS;
+
+  const session = await openSession(file, options);
+  const uploadId = session.upload_id;
+  options.onSession?.(uploadId);
+
+  let lastLine = 0;
+  const deliver = (results: TransactionResult[]) => {
+    // Responses can arrive out of order; each one holds every result after
+    // the cursor it was sent with, so anything at or before lastLine is known
+    const fresh = results.filter((r) => r.line_number > lastLine);
+    if (fresh.length > 0) {
+      lastLine = fresh[fresh.length - 1].line_number;
+      options.onResults?.(fresh);
+    }
+  };
+
+  const pendingOffsets: number[] = [];
+  let uploadedBytes = 0;
+  for (let offset = 0; offset < file.size; offset += chunkSize) {
+    const end = Math.min(offset + chunkSize, file.size);
+    if (isReceived(offset, end, session.received_ranges)) {
+      uploadedBytes += end - offset;
+    } else {
+      pendingOffsets.push(offset);
+    }
+  }
+  options.onProgress?.(uploadedBytes, file.size);
+
+  const sendChunk = async (offset: number) => {
+    const slice = file.slice(offset, offset + chunkSize);
+    for (let attempt = 0; ; attempt++) {
+      try {
+        const status = await requestJson<UploadStatus & { results: TransactionResult[] }>(
+          `${API_BASE_URL}/uploads/${uploadId}/chunks?offset=${offset}&after_line=${lastLine}`,
+          { method: 'PUT', body: slice }
+        );
+        uploadedBytes += slice.size;
+        options.onProgress?.(uploadedBytes, file.size);
+        deliver(status.results);
+        return;
+      } catch (error) {
+        if (attempt >= maxRetries) {
+          throw error;
+        }
+        await sleep(retryDelayMs * 2 ** attempt);
+      }
+    }
+  };
+
+  const worker = async () => {
+    let offset = pendingOffsets.shift();
+    while (offset !== undefined) {
+      try {
+        await sendChunk(offset);
+      } catch (error) {
+        // Stop the other workers; the session can be resumed later
+        pendingOffsets.length = 0;
+        throw error;
+      }
+      offset = pendingOffsets.shift();
+    }
+  };
+
+  const workerCount = Math.min(concurrency, pendingOffsets.length);
+  await Promise.all(Array.from({ length: workerCount }, worker));
+
+  // Catch up on anything still missing, including results processed before
+  // a resumed session was interrupted. The server pauses processing while too
+  // many results await collection, so keep fetching while results arrive.
+  let status: UploadStatus & { results: TransactionResult[] };
+  let previousLine: number;
+  do {
+    previousLine = lastLine;
+    status = await requestJson<UploadStatus & { results: TransactionResult[] }>(
+      `${API_BASE_URL}/uploads/${uploadId}/results?after_line=${lastLine}`
+    );
+    deliver(status.results);
+  } while (!status.completed && lastLine > previousLine);
+  if (!status.completed) {
+    throw new Error('Upload incomplete - please resume');
+  }
+
+  // Every result has been delivered, so the server can let the session go;
+  // if this fails it expires on its own
+  try {
+    await fetch(`${API_BASE_URL}/uploads/${uploadId}`, { method: 'DELETE' });
+  } catch {
+    // Ignore
+  }
+  return status;
+}
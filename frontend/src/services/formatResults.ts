@@ -0,0 +1,26 @@
+import { ProcessingMode, TransactionResult, UploadStatus } from '../types';
+
+// Same line format and line numbering as the /process-file endpoint
+export const formatSimpleResult = (result: TransactionResult): string =>
+  result.success ? result.formatted_change ?? '' : `Line ${result.line_number}: ${result.error}`;
+
+// Same document shape as the /process-file-detailed endpoint
+export const formatResultsText = (
+  results: TransactionResult[],
+  mode: ProcessingMode,
+  summary: UploadStatus | null
+): string => {
+  if (mode === 'simple') {
+    return results.map(formatSimpleResult).join('\n');
+  }
+  return JSON.stringify(
+    {
+      total_lines: summary?.total_lines ?? results.length,
+      processed_lines: results.filter((r) => r.success).length,
+      error_lines: results.filter((r) => !r.success).length,
+      results,
+    },
+    null,
+    2
+  );
+};
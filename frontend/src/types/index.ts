@@ -1,2 +1,29 @@
 // TypeScript module for type definitions
-export {};
+
+export type Locale = 'en-US' | 'fr-FR';
+
+export type ProcessingMode = 'simple' | 'detailed';
+
+// One processed line, as returned by /process-file-detailed and /uploads
+export interface TransactionResult {
+  line_number: number;
+  input: string;
+  success: boolean;
+  error?: string;
+  change_amount?: number;
+  change_cents?: number;
+  formatted_change?: string;
+  denominations?: Record<string, number>;
+  is_random?: boolean;
+}
+
+export interface UploadStatus {
+  upload_id: string;
+  total_size: number;
+  received_ranges: [number, number][];
+  processed_bytes: number;
+  total_lines: number;
+  processed_lines: number;
+  error_lines: number;
+  completed: boolean;
+}